@@ -1,14 +1,127 @@
-from django.contrib import admin
-from .models import TemperatureReading, TemperatureSetpoint
+import csv
+
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db.models import Max, Min
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
+
+from .jobs import EXPORT_FIELDS, iter_reading_chunks
+from .models import JobRun, ProfileSegment, SetpointProfile, TemperatureReading, TemperatureSetpoint
+
+
+CURSOR_VAR = 'before'
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never counts the whole table. Unfiltered tables are
+    estimated from the primary key range, filtered ones are counted up to
+    COUNT_LIMIT rows.
+    """
+    COUNT_LIMIT = 10000
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.has_filters():
+            self.estimated = True
+            # Separate MIN and MAX queries each resolve from the primary key index
+            first = queryset.aggregate(first=Min('pk'))['first']
+            if first is None:
+                return 0
+            return queryset.aggregate(last=Max('pk'))['last'] - first + 1
+        return queryset[:self.COUNT_LIMIT].count()
+
+    @property
+    def count_display(self):
+        if self.estimated:
+            return f'~{self.count}'
+        if self.count >= self.COUNT_LIMIT:
+            return f'{self.COUNT_LIMIT}+'
+        return str(self.count)
+
+
+class TimeSeriesChangeList(ChangeList):
+    """
+    Change list paged with a (timestamp, id) cursor instead of OFFSET, so
+    every page is an index seek no matter how deep it is. The `before`
+    parameter holds the id of the last reading on the previous page.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Filter and date links always start again from the newest readings
+        return super().get_query_string(new_params, [CURSOR_VAR, *(remove or [])])
+
+    def get_results(self, request):
+        super().get_results(request)
+
+        queryset = self.queryset
+        cursor = request.GET.get(CURSOR_VAR)
+        if cursor:
+            try:
+                before = TemperatureReading.objects.values_list('timestamp', flat=True).get(pk=int(cursor))
+            except (ValueError, TemperatureReading.DoesNotExist):
+                before = None
+            if before is not None:
+                queryset = queryset.filter(timestamp__lte=before).exclude(timestamp=before, pk__gte=int(cursor))
+
+        page = list(queryset[:self.list_per_page + 1])
+        self.result_list = page[:self.list_per_page]
+        self.has_older = len(page) > self.list_per_page
+        self.is_first_page = not cursor
+        self.multi_page = self.has_older or not self.is_first_page
+        self.can_show_all = False
+
+    @property
+    def older_url(self):
+        return self.get_query_string({CURSOR_VAR: self.result_list[-1].pk})
+
+    @property
+    def newest_url(self):
+        return self.get_query_string(remove=[CURSOR_VAR])
 
 
 @admin.register(TemperatureReading)
 class TemperatureReadingAdmin(admin.ModelAdmin):
     list_display = ('water_temperature', 'air_temperature', 'humidity', 'setpoint', 'pid_output', 'timestamp')
-    list_filter = ('timestamp',)
-    search_fields = ('timestamp',)
     readonly_fields = ('timestamp',)
-    ordering = ['-timestamp']
+    ordering = ['-timestamp', '-id']
+    # Sorting by other columns would bypass the timestamp index
+    sortable_by = ()
+    date_hierarchy = 'timestamp'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/api/temperaturereading/change_list.html'
+    actions = ['export_csv']
+
+    def get_changelist(self, request, **kwargs):
+        return TimeSeriesChangeList
+
+    @admin.action(description='Export selected readings to CSV')
+    def export_csv(self, request, queryset):
+        class Echo:
+            def write(self, value):
+                return value
+
+        writer = csv.writer(Echo())
+
+        def rows():
+            yield writer.writerow(EXPORT_FIELDS)
+            for chunk in iter_reading_chunks(2000, queryset):
+                for r in chunk:
+                    yield writer.writerow((*r[:-1], r[-1].isoformat()))
+
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="readings.csv"'
+        return response
 
 
 @admin.register(TemperatureSetpoint)
@@ -16,3 +129,44 @@ class TemperatureSetpointAdmin(admin.ModelAdmin):
     list_display = ('setpoint', 'min_setpoint', 'max_setpoint', 'updated_at')
     fields = ('setpoint', 'min_setpoint', 'max_setpoint')
     readonly_fields = ('updated_at',)
+
+
+class ProfileSegmentInline(admin.TabularInline):
+    model = ProfileSegment
+    fields = ('order', 'kind', 'target', 'rate', 'duration')
+    extra = 1
+
+
+@admin.register(SetpointProfile)
+class SetpointProfileAdmin(admin.ModelAdmin):
+    list_display = ('name', 'start_setpoint', 'is_active', 'started_at', 'updated_at')
+    fields = ('name', 'start_setpoint', 'is_active', 'started_at')
+    readonly_fields = ('is_active', 'started_at', 'updated_at')
+    inlines = [ProfileSegmentInline]
+    actions = ['start_profile', 'stop_profile']
+
+    @admin.action(description='Start selected profile')
+    def start_profile(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, 'Select exactly one profile to start', messages.ERROR)
+            return
+        profile = queryset.get()
+        try:
+            profile.start()
+        except ValueError as e:
+            self.message_user(request, f'Profile {profile.name} can\'t be started: {e}', messages.ERROR)
+            return
+        self.message_user(request, f'Profile {profile.name} started')
+
+    @admin.action(description='Stop selected profiles')
+    def stop_profile(self, request, queryset):
+        for profile in queryset.filter(is_active=True):
+            profile.stop()
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'rows_processed', 'duration', 'started_at')
+    list_filter = ('name', 'status')
+    readonly_fields = ('name', 'status', 'rows_processed', 'duration', 'message', 'started_at')
+    ordering = ['-started_at']
@@ -0,0 +1,318 @@
+"""
+Storage for validated sensor readings, with an optional write-behind buffer.
+
+With INGEST_WRITE_BEHIND enabled, receive_sensor_data acknowledges a reading
+as soon as it is queued here, and a background thread writes the queue with
+bulk_create every INGEST_FLUSH_INTERVAL_MS or once INGEST_FLUSH_ROWS are
+waiting. If INGEST_JOURNAL_PATH is set, every queued reading is also appended
+to an fsync'd journal that is replayed on startup, so acknowledged readings
+survive a crash (at least once: a crash between a flush and the journal
+rewrite can replay a batch twice).
+
+The buffer lives in one process, so each process journals to its own
+`<INGEST_JOURNAL_PATH>.<pid>` file and holds an flock on it while running.
+On startup a process takes over every journal whose lock is free, meaning
+its owner has exited, and never touches the journals of live workers.
+
+For the same reason latest_reading() only sees readings queued in the
+process serving the request. With several workers, a reading acknowledged
+by another worker shows up once that worker has flushed it, normally within
+INGEST_FLUSH_INTERVAL_MS.
+"""
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from . import validation
+from .models import TemperatureReading
+
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFull(Exception):
+    """Raised when the buffer is at capacity and the client should retry later"""
+
+
+class BatchTooLarge(Exception):
+    """Raised for a batch that is larger than the whole buffer and can never be queued"""
+
+
+class WriteBehindBuffer:
+    def __init__(self, capacity, flush_interval, flush_rows, journal_path=None):
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self._pending = []
+        self._in_flight = 0
+        self._latest = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._stopped = False
+        self._thread = None
+
+        self._journal = None
+        self._journal_base = Path(journal_path) if journal_path else None
+        if self._journal_base is not None:
+            self._journal_path = self._journal_base.with_name(f'{self._journal_base.name}.{os.getpid()}')
+            with self._scan_lock(fcntl.LOCK_EX):
+                claimed = self._replay_journals()
+                self._write_journal()
+                for path, f in claimed:
+                    if path != self._journal_path:
+                        path.unlink()
+                    f.close()
+
+    def append(self, values):
+        """Queue a reading (a dict of TemperatureReading field values)"""
+        self.extend([values])
+
+    def extend(self, values_list):
+        """Queue several readings, all or none"""
+        if not values_list:
+            return
+        if len(values_list) > self.capacity:
+            raise BatchTooLarge(f'Batches are limited to {self.capacity} readings')
+        with self._lock:
+            if self._stopped or len(self._pending) + self._in_flight + len(values_list) > self.capacity:
+                raise BufferFull('Ingest buffer is full')
+            if self._journal is not None:
+                self._journal.write(''.join(self._journal_line(values) for values in values_list))
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            self._pending.extend(values_list)
+            self._latest = values_list[-1]
+            if len(self._pending) >= self.flush_rows:
+                self._wakeup.notify()
+
+    def latest(self):
+        """Newest reading not yet written to the database, or None"""
+        with self._lock:
+            if self._pending or self._in_flight:
+                return self._latest
+            return None
+
+    def flush(self):
+        """Write all queued readings to the database, returns the number written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._in_flight = len(batch)
+            if not batch:
+                return 0
+
+            try:
+                TemperatureReading.objects.bulk_create(
+                    [TemperatureReading(**values) for values in batch],
+                    batch_size=self.flush_rows
+                )
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._in_flight = 0
+                raise
+
+            with self._lock:
+                self._in_flight = 0
+                if self._journal is not None:
+                    self._rewrite_journal()
+            return len(batch)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='ingest-flusher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop accepting readings and flush whatever is still queued"""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+        else:
+            self.flush()
+        if self._journal is not None:
+            with self._lock:
+                if not self._pending:
+                    self._journal_path.unlink()
+                self._journal.close()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._wakeup.wait_for(
+                    lambda: self._stopped or len(self._pending) >= self.flush_rows,
+                    timeout=self.flush_interval
+                )
+                stopping = self._stopped
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush queued readings, retrying')
+            if stopping:
+                break
+        connection.close()
+
+    @staticmethod
+    def _journal_line(values):
+        return json.dumps({**values, 'timestamp': values['timestamp'].isoformat()}) + '\n'
+
+    def _scan_lock(self, operation):
+        """
+        Lock held exclusively while claiming journals and shared while a
+        journal is swapped in _rewrite_journal, so a starting process never
+        sees a live journal in the moment before it is locked again
+        """
+        lock_path = self._journal_base.with_name(self._journal_base.name + '.lock')
+        lock_file = open(lock_path, 'a')
+        fcntl.flock(lock_file, operation)
+        return lock_file
+
+    def _journal_files(self):
+        base = self._journal_base
+        # The unsuffixed file is a journal written before journals were per process
+        paths = [base] if base.exists() else []
+        return paths + sorted(p for p in base.parent.glob(base.name + '.*') if p.suffix[1:].isdigit())
+
+    def _replay_journals(self):
+        """Queue the readings of every journal whose owner has exited; returns the claimed files"""
+        claimed = []
+        for path in self._journal_files():
+            f = open(path)
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Owned by a running process
+                f.close()
+                continue
+            claimed.append((path, f))
+            replayed = 0
+            for line in f:
+                try:
+                    values = json.loads(line)
+                    values['timestamp'] = datetime.fromisoformat(values['timestamp'])
+                except (ValueError, KeyError):
+                    # Torn write from a crash mid-append
+                    continue
+                self._pending.append(values)
+                self._latest = values
+                replayed += 1
+            if replayed:
+                logger.warning('Replayed %d readings from %s', replayed, path)
+        return claimed
+
+    def _rewrite_journal(self):
+        # Keep only readings that are still queued; caller holds self._lock
+        with self._scan_lock(fcntl.LOCK_SH):
+            self._write_journal()
+
+    def _write_journal(self):
+        # Caller holds the scan lock, flock doesn't let one process take it twice
+        tmp_path = self._journal_path.with_name(self._journal_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            for values in self._pending:
+                f.write(self._journal_line(values))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._journal_path)
+        journal = open(self._journal_path, 'a')
+        fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = journal
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """Get the process-wide buffer, starting its flusher thread on first use"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBehindBuffer(
+                capacity=settings.INGEST_BUFFER_SIZE,
+                flush_interval=settings.INGEST_FLUSH_INTERVAL_MS / 1000,
+                flush_rows=settings.INGEST_FLUSH_ROWS,
+                journal_path=settings.INGEST_JOURNAL_PATH
+            )
+            _buffer.start()
+            atexit.register(_buffer.stop)
+    return _buffer
+
+
+def save_reading(values):
+    """
+    Store a reading, through the write-behind buffer when it is enabled.
+    Returns the new reading id, or None if the reading was queued.
+    Raises BufferFull when the buffer is at capacity.
+    """
+    if not settings.INGEST_WRITE_BEHIND:
+        return TemperatureReading.objects.create(**values).id
+    values.setdefault('timestamp', timezone.now())
+    get_buffer().append(values)
+    return None
+
+
+def save_readings(values_list):
+    """
+    Store several readings at once; returns how many were stored or queued.
+    Raises BufferFull when the buffer is at capacity, and BatchTooLarge when
+    the batch is larger than the buffer.
+    """
+    if not settings.INGEST_WRITE_BEHIND:
+        TemperatureReading.objects.bulk_create([TemperatureReading(**values) for values in values_list])
+        return len(values_list)
+    now = timezone.now()
+    for values in values_list:
+        values.setdefault('timestamp', now)
+    get_buffer().extend(values_list)
+    return len(values_list)
+
+
+def ingest_payloads(payloads):
+    """
+    Validate and store a list of sensor payloads, skipping invalid ones.
+    Returns (number stored, {payload index: {key: message}}).
+    """
+    validator = validation.get_validator()
+    valid = []
+    errors = {}
+    for index, payload in enumerate(payloads):
+        try:
+            valid.append(validator.validate(payload))
+        except validation.PayloadError as e:
+            errors[index] = e.errors
+    return save_readings(valid), errors
+
+
+def latest_reading():
+    """Get the latest reading, including one still waiting in this process's buffer"""
+    # Read the buffer first: a reading flushed after this point is in the database below
+    queued = get_buffer().latest() if settings.INGEST_WRITE_BEHIND else None
+
+    try:
+        reading = TemperatureReading.objects.latest('timestamp')
+    except TemperatureReading.DoesNotExist:
+        reading = None
+
+    if queued is not None and (reading is None or queued['timestamp'] >= reading.timestamp):
+        reading = TemperatureReading(**queued)
+
+    if reading is None:
+        raise TemperatureReading.DoesNotExist('No readings available')
+    return reading
@@ -0,0 +1,200 @@
+"""
+Background maintenance jobs run by the `run_jobs` management command.
+
+Jobs walk the readings table in chunks of JOB_CHUNK_SIZE rows so that each
+transaction, and with it the SQLite write lock, is only held briefly and
+sensor ingest can keep writing in between.
+"""
+
+import csv
+import json
+import logging
+import sqlite3
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import TemperatureReading
+
+
+logger = logging.getLogger(__name__)
+
+
+EXPORT_FIELDS = ('id', 'water_temperature', 'air_temperature', 'humidity', 'setpoint', 'pid_output', 'timestamp')
+
+
+def _backup_dir():
+    path = Path(settings.BACKUP_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _stamp():
+    return timezone.now().strftime('%Y%m%d_%H%M%S')
+
+
+def iter_reading_chunks(chunk_size, queryset=None):
+    """Yield readings as value tuples in id order, one short query per chunk"""
+    if queryset is None:
+        queryset = TemperatureReading.objects.all()
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .values_list(*EXPORT_FIELDS)[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+
+def backup_database(chunk_size):
+    """Copy the SQLite database with the online backup API, chunk_size pages per step"""
+    db = settings.DATABASES['default']
+    if db['ENGINE'] != 'django.db.backends.sqlite3':
+        raise RuntimeError('Database backups are only supported for SQLite')
+
+    target = _backup_dir() / f'db_backup_{_stamp()}.sqlite3'
+    pages = 0
+
+    def progress(status, remaining, total):
+        nonlocal pages
+        pages = total
+
+    source = sqlite3.connect(str(db['NAME']))
+    dest = sqlite3.connect(str(target))
+    try:
+        source.backup(dest, pages=chunk_size, progress=progress, sleep=settings.JOB_CHUNK_PAUSE)
+    finally:
+        dest.close()
+        source.close()
+    return pages
+
+
+def export_csv(chunk_size):
+    """Export all readings to a timestamped CSV file"""
+    target = _backup_dir() / f'readings_{_stamp()}.csv'
+    rows = 0
+    with open(target, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_FIELDS)
+        for chunk in iter_reading_chunks(chunk_size):
+            writer.writerows((*r[:-1], r[-1].isoformat()) for r in chunk)
+            rows += len(chunk)
+    return rows
+
+
+def export_json(chunk_size):
+    """Export all readings to a timestamped JSON file"""
+    target = _backup_dir() / f'readings_{_stamp()}.json'
+    rows = 0
+    with open(target, 'w') as f:
+        f.write('[')
+        for chunk in iter_reading_chunks(chunk_size):
+            for r in chunk:
+                record = dict(zip(EXPORT_FIELDS, r))
+                record['timestamp'] = record['timestamp'].isoformat()
+                f.write((',\n' if rows else '\n') + json.dumps(record))
+                rows += 1
+        f.write('\n]\n')
+    return rows
+
+
+def prune_readings(chunk_size):
+    """Delete readings older than READING_RETENTION_DAYS, one short transaction per chunk"""
+    cutoff = timezone.now() - timedelta(days=settings.READING_RETENTION_DAYS)
+    rows = 0
+    while True:
+        ids = list(
+            TemperatureReading.objects
+            .filter(timestamp__lt=cutoff)
+            .order_by('id')
+            .values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return rows
+        with transaction.atomic():
+            deleted, _ = TemperatureReading.objects.filter(id__in=ids).delete()
+        rows += deleted
+        time.sleep(settings.JOB_CHUNK_PAUSE)
+
+
+def prune_backups(chunk_size):
+    """Delete backup and export files older than BACKUP_RETENTION_DAYS"""
+    cutoff = time.time() - settings.BACKUP_RETENTION_DAYS * 24 * 60 * 60
+    removed = 0
+    for path in _backup_dir().iterdir():
+        if path.is_file() and path.stat().st_mtime < cutoff:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def vacuum(chunk_size):
+    """
+    Reclaim free pages with incremental_vacuum, chunk_size pages at a time.
+    A full VACUUM rewrites the whole file under an exclusive lock, so the job
+    skips databases that are not in auto_vacuum=INCREMENTAL mode; switch them
+    once with `python manage.py enable_incremental_vacuum`.
+    """
+    if connection.vendor != 'sqlite':
+        logger.warning('Skipping vacuum, only supported for SQLite')
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA auto_vacuum')
+        if cursor.fetchone()[0] != 2:
+            logger.warning(
+                'Skipping vacuum, the database is not in auto_vacuum=INCREMENTAL mode; '
+                'run `python manage.py enable_incremental_vacuum` once to switch it'
+            )
+            return 0
+
+        cursor.execute('PRAGMA freelist_count')
+        free_pages = cursor.fetchone()[0]
+
+        remaining = free_pages
+        while remaining:
+            cursor.execute(f'PRAGMA incremental_vacuum({int(chunk_size)})')
+            cursor.fetchall()
+            cursor.execute('PRAGMA freelist_count')
+            left = cursor.fetchone()[0]
+            if left >= remaining:
+                break
+            remaining = left
+            time.sleep(settings.JOB_CHUNK_PAUSE)
+    return free_pages - remaining
+
+
+JOBS = {
+    'backup_database': backup_database,
+    'export_csv': export_csv,
+    'export_json': export_json,
+    'prune_readings': prune_readings,
+    'prune_backups': prune_backups,
+    'vacuum': vacuum,
+}
+
+
+def run_job(name, chunk_size):
+    """
+    Run a single job and return (rows processed, duration in seconds, error).
+    Called inside worker processes, so errors are returned instead of raised.
+    """
+    started = time.monotonic()
+    error = ''
+    rows = 0
+    try:
+        rows = JOBS[name](chunk_size)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    finally:
+        connection.close()
+    return rows, time.monotonic() - started, error
@@ -0,0 +1,34 @@
+"""
+Django management command that switches the SQLite database to incremental auto-vacuum
+Usage: python manage.py enable_incremental_vacuum
+
+This runs one full VACUUM, which rewrites the whole database file under an
+exclusive lock, so run it while ingest is stopped. Afterwards the `vacuum`
+job only needs short incremental_vacuum steps.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = 'Switch the SQLite database to auto_vacuum=INCREMENTAL (one-off full VACUUM)'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Incremental vacuum is only supported for SQLite')
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA auto_vacuum')
+            if cursor.fetchone()[0] == 2:
+                self.stdout.write(self.style.WARNING('Incremental auto-vacuum is already enabled'))
+                return
+
+            self.stdout.write('Rewriting the database with a full VACUUM...')
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
+            cursor.execute('PRAGMA auto_vacuum')
+            if cursor.fetchone()[0] != 2:
+                raise CommandError('SQLite did not switch to incremental auto-vacuum')
+
+        self.stdout.write(self.style.SUCCESS('Incremental auto-vacuum enabled, add "vacuum" to JOB_SCHEDULE'))
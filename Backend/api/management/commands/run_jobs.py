@@ -0,0 +1,131 @@
+"""
+Django management command that runs maintenance jobs on a schedule
+Usage: python manage.py run_jobs [--once] [--job NAME] [--workers N]
+
+Jobs run in a process pool so a long export never blocks the scheduler,
+and every run is recorded as a JobRun with its duration and row count.
+"""
+
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from api.jobs import JOBS, run_job
+from api.models import JobRun
+
+
+POLL_INTERVAL = 1.0
+
+
+def _init_worker():
+    # Ctrl+C is handled by the scheduler, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Forked workers must not reuse the parent's database connections
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run scheduled backups, exports, retention pruning and vacuum'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the selected jobs immediately and exit'
+        )
+
+        parser.add_argument(
+            '--job',
+            action='append',
+            choices=sorted(JOBS),
+            help='Only run this job (can be repeated)'
+        )
+
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.JOB_WORKERS,
+            help='Number of worker processes'
+        )
+
+    def handle(self, *args, **options):
+        names = options['job'] or list(settings.JOB_SCHEDULE)
+        unknown = [name for name in names if name not in JOBS]
+        if unknown:
+            raise CommandError(f'Unknown jobs in JOB_SCHEDULE: {", ".join(unknown)}')
+        if not options['once']:
+            unscheduled = [name for name in names if name not in settings.JOB_SCHEDULE]
+            if unscheduled:
+                raise CommandError(f'No interval configured in JOB_SCHEDULE for: {", ".join(unscheduled)}')
+
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            if options['once']:
+                running = {self._submit(pool, name): (name, timezone.now()) for name in names}
+                for future in list(running):
+                    self._record(future, *running.pop(future))
+                return
+
+            self.stdout.write(self.style.SUCCESS(f'Scheduling jobs: {", ".join(names)}'))
+            try:
+                self._run_forever(pool, names)
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING('\nStopping job runner...'))
+
+    def _run_forever(self, pool, names):
+        next_run = {name: self._next_run(name) for name in names}
+        running = {}
+
+        while True:
+            busy = {name for name, _ in running.values()}
+            for name in names:
+                if name not in busy and next_run[name] <= time.time():
+                    running[self._submit(pool, name)] = (name, timezone.now())
+
+            if not running:
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            done, _ = wait(running, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, started_at = running.pop(future)
+                self._record(future, name, started_at)
+                next_run[name] = time.time() + settings.JOB_SCHEDULE[name]
+
+    def _next_run(self, name):
+        """Schedule from the last recorded run so restarts don't rerun everything"""
+        last = JobRun.objects.filter(name=name).first()
+        if last is None:
+            return time.time()
+        return last.started_at.timestamp() + settings.JOB_SCHEDULE[name]
+
+    def _submit(self, pool, name):
+        connections.close_all()
+        self.stdout.write(f'Running {name}...')
+        return pool.submit(run_job, name, settings.JOB_CHUNK_SIZE)
+
+    def _record(self, future, name, started_at):
+        try:
+            rows, duration, error = future.result()
+        except Exception as e:
+            rows, duration, error = 0, (timezone.now() - started_at).total_seconds(), f'{type(e).__name__}: {e}'
+
+        JobRun.objects.create(
+            name=name,
+            status=JobRun.STATUS_FAILED if error else JobRun.STATUS_SUCCESS,
+            rows_processed=rows,
+            duration=duration,
+            message=error,
+            started_at=started_at
+        )
+
+        if error:
+            self.stdout.write(self.style.ERROR(f'✗ {name} failed after {duration:.2f}s: {error}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✓ {name}: {rows} rows in {duration:.2f}s'))
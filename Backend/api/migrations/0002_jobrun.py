@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('failed', 'Failed')], default='success', max_length=10)),
+                ('rows_processed', models.IntegerField(default=0)),
+                ('duration', models.FloatField(help_text='Run time in seconds')),
+                ('message', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
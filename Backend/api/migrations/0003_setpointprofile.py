@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_jobrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SetpointProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('start_setpoint', models.FloatField(default=25.0)),
+                ('is_active', models.BooleanField(default=False)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProfileSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('kind', models.CharField(choices=[('ramp', 'Ramp'), ('hold', 'Hold'), ('step', 'Step')], max_length=4)),
+                ('target', models.FloatField(blank=True, help_text='Target setpoint for ramp and step segments', null=True)),
+                ('rate', models.FloatField(blank=True, help_text='Ramp rate in °C/min', null=True)),
+                ('duration', models.FloatField(blank=True, help_text='Hold time in minutes', null=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='api.setpointprofile')),
+            ],
+            options={
+                'ordering': ['order', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_reading_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='temperaturereading',
+            name='timestamp',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+    ]
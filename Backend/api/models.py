@@ -1,4 +1,8 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
+
+from . import profiles
 
 class TemperatureReading(models.Model):
     """Model to store temperature and humidity readings from Arduino"""
@@ -7,7 +11,8 @@ class TemperatureReading(models.Model):
     humidity = models.FloatField()
     setpoint = models.FloatField()
     pid_output = models.FloatField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add, so readings queued for write-behind keep their receive time
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
 
     class Meta:
         ordering = ['-timestamp']
@@ -37,3 +42,132 @@ class TemperatureSetpoint(models.Model):
             defaults={'setpoint': 25.0}
         )
         return obj
+
+
+class SetpointProfile(models.Model):
+    """Model to store a ramp-soak setpoint program made of ProfileSegments"""
+    name = models.CharField(max_length=100)
+    start_setpoint = models.FloatField(default=25.0)
+    is_active = models.BooleanField(default=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Built evaluators per profile id, rebuilt when updated_at changes
+    _evaluators = {}
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        bounds = TemperatureSetpoint.get_or_create_default()
+        if not bounds.min_setpoint <= self.start_setpoint <= bounds.max_setpoint:
+            raise ValidationError({
+                'start_setpoint': f'Setpoint must be between {bounds.min_setpoint} and {bounds.max_setpoint}'
+            })
+
+    @classmethod
+    def get_active(cls):
+        """Get the running profile, if any"""
+        return cls.objects.filter(is_active=True, started_at__isnull=False).first()
+
+    def get_evaluator(self):
+        """Get the precomputed evaluator, only querying segments when the profile changed"""
+        cached = self._evaluators.get(self.pk)
+        if cached is None or cached[0] != self.updated_at:
+            segments = self.segments.values_list('kind', 'target', 'rate', 'duration')
+            cached = (self.updated_at, profiles.ProfileEvaluator(self.start_setpoint, segments))
+            self._evaluators[self.pk] = cached
+        return cached[1]
+
+    def elapsed(self, when):
+        return (when - self.started_at).total_seconds()
+
+    def setpoint_at(self, when):
+        return self.get_evaluator().setpoint_at(self.elapsed(when))
+
+    def start(self):
+        """
+        Run this profile from now on, stopping any other running profile.
+        Raises ValueError, without stopping anything, if the segments can't be evaluated.
+        """
+        self.get_evaluator()
+        SetpointProfile.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
+        self.is_active = True
+        self.started_at = timezone.now()
+        self.save()
+
+    def stop(self):
+        self.is_active = False
+        self.save()
+
+
+class ProfileSegment(models.Model):
+    """Model to store one ramp, hold or step of a SetpointProfile"""
+    KIND_CHOICES = [
+        (profiles.RAMP, 'Ramp'),
+        (profiles.HOLD, 'Hold'),
+        (profiles.STEP, 'Step'),
+    ]
+
+    profile = models.ForeignKey(SetpointProfile, on_delete=models.CASCADE, related_name='segments')
+    order = models.PositiveIntegerField(default=0)
+    kind = models.CharField(max_length=4, choices=KIND_CHOICES)
+    target = models.FloatField(null=True, blank=True, help_text='Target setpoint for ramp and step segments')
+    rate = models.FloatField(null=True, blank=True, help_text='Ramp rate in °C/min')
+    duration = models.FloatField(null=True, blank=True, help_text='Hold time in minutes')
+
+    class Meta:
+        ordering = ['order', 'id']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} ({self.profile})"
+
+    def clean(self):
+        if self.kind in (profiles.RAMP, profiles.STEP):
+            if self.target is None:
+                raise ValidationError({'target': 'Ramp and step segments need a target'})
+            bounds = TemperatureSetpoint.get_or_create_default()
+            if not bounds.min_setpoint <= self.target <= bounds.max_setpoint:
+                raise ValidationError({
+                    'target': f'Setpoint must be between {bounds.min_setpoint} and {bounds.max_setpoint}'
+                })
+        if self.kind == profiles.RAMP and (self.rate is None or self.rate <= 0):
+            raise ValidationError({'rate': 'Ramp segments need a positive rate'})
+        if self.kind == profiles.HOLD and (self.duration is None or self.duration < 0):
+            raise ValidationError({'duration': 'Hold segments need a duration'})
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._touch_profile()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._touch_profile()
+        return result
+
+    def _touch_profile(self):
+        # Bump updated_at so cached evaluators are rebuilt
+        SetpointProfile.objects.filter(pk=self.profile_id).update(updated_at=timezone.now())
+
+
+class JobRun(models.Model):
+    """Model to store the outcome of a background maintenance job"""
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_SUCCESS, 'Success'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_SUCCESS)
+    rows_processed = models.IntegerField(default=0)
+    duration = models.FloatField(help_text='Run time in seconds')
+    message = models.TextField(blank=True)
+    started_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.name} at {self.started_at} ({self.status})"
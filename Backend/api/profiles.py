@@ -0,0 +1,76 @@
+"""
+Ramp-soak setpoint profile evaluation.
+
+A profile is turned into a piecewise linear list of (time, setpoint)
+breakpoints once, after which the active setpoint for any moment is a binary
+search plus one interpolation. This module has no Django dependencies so it
+can be benchmarked and reused outside the web process.
+"""
+
+from bisect import bisect_right
+
+
+RAMP = 'ramp'
+HOLD = 'hold'
+STEP = 'step'
+
+
+class ProfileEvaluator:
+    """
+    Precomputed setpoint schedule.
+
+    Segments are (kind, target, rate, duration) tuples:
+      ramp: move linearly to `target` at `rate` °C/min
+      hold: keep the current setpoint for `duration` minutes
+      step: jump straight to `target`
+    """
+
+    def __init__(self, start_setpoint, segments):
+        times = [0.0]
+        values = [float(start_setpoint)]
+        elapsed = 0.0
+        value = float(start_setpoint)
+
+        for kind, target, rate, duration in segments:
+            if kind in (RAMP, STEP) and target is None:
+                raise ValueError(f'{kind.capitalize()} segments need a target')
+            if kind == RAMP:
+                if not rate or rate <= 0:
+                    raise ValueError('Ramp segments need a positive rate')
+                elapsed += abs(target - value) / rate * 60
+                value = float(target)
+            elif kind == HOLD:
+                if duration is None or duration < 0:
+                    raise ValueError('Hold segments need a non-negative duration')
+                elapsed += duration * 60
+            elif kind == STEP:
+                value = float(target)
+            else:
+                raise ValueError(f'Unknown segment type: {kind}')
+            times.append(elapsed)
+            values.append(value)
+
+        self.times = times
+        self.values = values
+        # Slope of the line leaving each breakpoint; zero-length spans are steps
+        self.slopes = [
+            (values[i + 1] - values[i]) / (times[i + 1] - times[i]) if times[i + 1] > times[i] else 0.0
+            for i in range(len(times) - 1)
+        ]
+
+    @property
+    def duration(self):
+        """Total profile length in seconds"""
+        return self.times[-1]
+
+    def setpoint_at(self, elapsed):
+        """Setpoint `elapsed` seconds after the profile started"""
+        i = bisect_right(self.times, elapsed)
+        if i == 0:
+            return self.values[0]
+        if i == len(self.times):
+            return self.values[-1]
+        return self.values[i - 1] + self.slopes[i - 1] * (elapsed - self.times[i - 1])
+
+    def is_finished(self, elapsed):
+        return elapsed >= self.times[-1]
@@ -1,3 +1,553 @@
-from django.test import TestCase
+import csv
+import json
+import sqlite3
+import tempfile
+from concurrent.futures import Future
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+
+from smartAquarium import mqtt, mqtt_fake
+
+from . import ingest, jobs, profiles, validation
+from .management.commands import run_jobs
+from .models import JobRun, ProfileSegment, SetpointProfile, TemperatureReading, TemperatureSetpoint
+
+
+READING_VALUES = {
+    'water_temperature': 24.5,
+    'air_temperature': 26.2,
+    'humidity': 60.5,
+    'setpoint': 25.0,
+    'pid_output': 120,
+}
+
+
+def create_reading(**kwargs):
+    values = dict(READING_VALUES, **kwargs)
+    return TemperatureReading.objects.create(**values)
+
+
+class InlinePool:
+    """Stands in for ProcessPoolExecutor, running each job when it is submitted"""
+
+    def __init__(self, max_workers=None, initializer=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+@override_settings(JOB_CHUNK_PAUSE=0)
+class JobTests(TestCase):
+    def test_prune_readings_deletes_only_expired_rows(self):
+        old = [create_reading() for _ in range(5)]
+        create_reading()
+        TemperatureReading.objects.filter(id__in=[r.id for r in old]).update(
+            timestamp=timezone.now() - timedelta(days=365)
+        )
+
+        with override_settings(READING_RETENTION_DAYS=30):
+            deleted = jobs.prune_readings(chunk_size=2)
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(TemperatureReading.objects.count(), 1)
+
+    def test_export_csv_writes_every_reading(self):
+        for i in range(7):
+            create_reading(water_temperature=20 + i)
+
+        with tempfile.TemporaryDirectory() as backup_dir:
+            with override_settings(BACKUP_DIR=backup_dir):
+                rows = jobs.export_csv(chunk_size=3)
+            [export] = Path(backup_dir).glob('readings_*.csv')
+            with open(export, newline='') as f:
+                records = list(csv.DictReader(f))
+
+        self.assertEqual(rows, 7)
+        self.assertEqual([float(r['water_temperature']) for r in records], [20 + i for i in range(7)])
+
+    def test_vacuum_never_runs_a_full_vacuum(self):
+        # The test database is not in auto_vacuum=INCREMENTAL mode
+        with CaptureQueriesContext(connection) as queries, self.assertLogs('api.jobs', 'WARNING'):
+            freed = jobs.vacuum(chunk_size=100)
+
+        self.assertEqual(freed, 0)
+        self.assertNotIn('VACUUM', [q['sql'].strip().upper() for q in queries])
+
+    def test_backup_database_copies_a_file_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source_path = Path(tmp) / 'source.sqlite3'
+            source = sqlite3.connect(source_path)
+            source.execute('CREATE TABLE readings (value REAL)')
+            source.executemany('INSERT INTO readings VALUES (?)', [(i,) for i in range(5000)])
+            source.commit()
+            source.close()
+
+            backup_dir = Path(tmp) / 'backups'
+            with mock.patch.dict(settings.DATABASES['default'], {'NAME': source_path}), \
+                    override_settings(BACKUP_DIR=backup_dir):
+                pages = jobs.backup_database(chunk_size=1)
+
+            [backup_path] = backup_dir.glob('db_backup_*.sqlite3')
+            backup = sqlite3.connect(backup_path)
+            copied = backup.execute('SELECT COUNT(*), SUM(value) FROM readings').fetchone()
+            backup.close()
+
+        self.assertGreater(pages, 1)
+        self.assertEqual(copied, (5000, sum(range(5000))))
+
+
+@override_settings(JOB_CHUNK_PAUSE=0)
+class RunJobsCommandTests(TestCase):
+    def run_once(self, *names):
+        with mock.patch.object(run_jobs, 'ProcessPoolExecutor', InlinePool), \
+                mock.patch.object(jobs.connection, 'close'):
+            call_command('run_jobs', once=True, job=list(names), stdout=StringIO())
+
+    def test_once_records_a_successful_run(self):
+        create_reading()
+        TemperatureReading.objects.update(timestamp=timezone.now() - timedelta(days=365))
+
+        with override_settings(READING_RETENTION_DAYS=30):
+            self.run_once('prune_readings')
+
+        run = JobRun.objects.get()
+        self.assertEqual(run.name, 'prune_readings')
+        self.assertEqual(run.status, JobRun.STATUS_SUCCESS)
+        self.assertEqual(run.rows_processed, 1)
+        self.assertGreaterEqual(run.duration, 0)
+        self.assertEqual(run.message, '')
+
+    def test_once_records_a_failed_run(self):
+        def broken(chunk_size):
+            raise OSError('disk full')
+
+        with tempfile.TemporaryDirectory() as backup_dir:
+            with mock.patch.dict(jobs.JOBS, {'export_json': broken}), override_settings(BACKUP_DIR=backup_dir):
+                self.run_once('export_json', 'prune_backups')
+
+        failed = JobRun.objects.get(name='export_json')
+        self.assertEqual(failed.status, JobRun.STATUS_FAILED)
+        self.assertEqual(failed.rows_processed, 0)
+        self.assertEqual(failed.message, 'OSError: disk full')
+        self.assertEqual(JobRun.objects.get(name='prune_backups').status, JobRun.STATUS_SUCCESS)
+
+    def test_scheduler_waits_for_the_interval_after_the_last_run(self):
+        JobRun.objects.create(name='prune_readings', duration=1, started_at=timezone.now())
+
+        with override_settings(JOB_SCHEDULE={'prune_readings': 3600}):
+            next_run = run_jobs.Command()._next_run('prune_readings')
+
+        self.assertAlmostEqual(next_run, timezone.now().timestamp() + 3600, delta=5)
+
+
+class ProfileEvaluatorTests(TestCase):
+    def setUp(self):
+        # 20 -> 30 at 1°C/min, hold 10 min, step to 25
+        self.evaluator = profiles.ProfileEvaluator(20, [
+            (profiles.RAMP, 30, 1, None),
+            (profiles.HOLD, None, None, 10),
+            (profiles.STEP, 25, None, None),
+        ])
+
+    def test_setpoint_follows_ramp_hold_and_step(self):
+        self.assertEqual(self.evaluator.setpoint_at(-5), 20)
+        self.assertAlmostEqual(self.evaluator.setpoint_at(5 * 60), 25)
+        self.assertEqual(self.evaluator.setpoint_at(10 * 60), 30)
+        self.assertEqual(self.evaluator.setpoint_at(15 * 60), 30)
+        self.assertEqual(self.evaluator.setpoint_at(20 * 60), 25)
+        self.assertEqual(self.evaluator.setpoint_at(10 ** 6), 25)
+        self.assertEqual(self.evaluator.duration, 20 * 60)
+
+    def test_ramp_without_rate_is_rejected(self):
+        with self.assertRaises(ValueError):
+            profiles.ProfileEvaluator(20, [(profiles.RAMP, 30, 0, None)])
+
+    def test_segments_without_target_are_rejected(self):
+        for kind in (profiles.RAMP, profiles.STEP):
+            with self.assertRaises(ValueError):
+                profiles.ProfileEvaluator(20, [(kind, None, 1, None)])
+
+
+class SetpointProfileApiTests(TestCase):
+    def test_get_setpoint_follows_running_profile(self):
+        profile = SetpointProfile.objects.create(name='Anneal', start_setpoint=20)
+        ProfileSegment.objects.create(profile=profile, order=1, kind=profiles.RAMP, target=30, rate=1)
+        profile.start()
+        SetpointProfile.objects.filter(pk=profile.pk).update(started_at=timezone.now() - timedelta(minutes=5))
+
+        data = self.client.get(reverse('get_setpoint')).json()
+
+        self.assertAlmostEqual(data['setpoint'], 25, places=1)
+        self.assertEqual(data['profile']['name'], 'Anneal')
+        self.assertFalse(data['profile']['finished'])
+
+    def test_stopping_profile_restores_static_setpoint(self):
+        profile = SetpointProfile.objects.create(name='Anneal', start_setpoint=30)
+        profile.start()
+
+        response = self.client.post(reverse('stop_profile'))
+        data = self.client.get(reverse('get_setpoint')).json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['setpoint'], 25.0)
+        self.assertIsNone(data['profile'])
+
+    def set_setpoint(self, value):
+        return self.client.post(
+            reverse('set_setpoint'), json.dumps({'setpoint': value}), content_type='application/json'
+        )
+
+    def test_profile_that_cannot_be_evaluated_is_not_started(self):
+        profile = SetpointProfile.objects.create(name='Broken', start_setpoint=30)
+        ProfileSegment.objects.create(profile=profile, order=1, kind=profiles.STEP)
+
+        response = self.client.post(
+            reverse('start_profile'), json.dumps({'profile_id': profile.id}), content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(SetpointProfile.get_active())
+
+    def test_invalid_running_profile_is_ignored_by_every_endpoint(self):
+        # Segments changed through the ORM after the profile was started
+        profile = SetpointProfile.objects.create(name='Broken', start_setpoint=30)
+        profile.start()
+        ProfileSegment.objects.create(profile=profile, order=1, kind=profiles.STEP)
+
+        with self.assertLogs('api.views', 'ERROR'):
+            response = self.client.get(reverse('get_setpoint'))
+            updated = self.set_setpoint(35)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['setpoint'], 25.0)
+        self.assertIsNone(response.json()['profile'])
+        self.assertEqual(updated.status_code, 200)
+
+    def test_manual_setpoint_is_rejected_while_profile_runs(self):
+        profile = SetpointProfile.objects.create(name='Anneal', start_setpoint=30)
+        ProfileSegment.objects.create(profile=profile, order=1, kind=profiles.HOLD, duration=60)
+        profile.start()
+
+        response = self.set_setpoint(35)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('Anneal', response.json()['message'])
+        self.assertEqual(self.client.get(reverse('get_setpoint')).json()['setpoint'], 30)
+
+    def test_manual_setpoint_stops_a_finished_profile(self):
+        profile = SetpointProfile.objects.create(name='Anneal', start_setpoint=30)
+        ProfileSegment.objects.create(profile=profile, order=1, kind=profiles.HOLD, duration=60)
+        profile.start()
+        SetpointProfile.objects.filter(pk=profile.pk).update(started_at=timezone.now() - timedelta(hours=2))
+
+        response = self.set_setpoint(35)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(SetpointProfile.get_active())
+        self.assertEqual(self.client.get(reverse('get_setpoint')).json()['setpoint'], 35)
+
+
+class WriteBehindBufferTests(TestCase):
+    def queued(self, **kwargs):
+        return dict(READING_VALUES, timestamp=timezone.now(), **kwargs)
+
+    def test_flush_writes_queued_readings_with_receive_time(self):
+        buffer = ingest.WriteBehindBuffer(capacity=10, flush_interval=1, flush_rows=5)
+        received = self.queued(water_temperature=30)
+        buffer.append(received)
+
+        self.assertEqual(buffer.latest(), received)
+        self.assertEqual(buffer.flush(), 1)
+        self.assertIsNone(buffer.latest())
+        reading = TemperatureReading.objects.get()
+        self.assertEqual(reading.water_temperature, 30)
+        self.assertEqual(reading.timestamp, received['timestamp'])
+
+    def test_full_buffer_rejects_readings(self):
+        buffer = ingest.WriteBehindBuffer(capacity=2, flush_interval=1, flush_rows=5)
+        buffer.append(self.queued())
+        buffer.append(self.queued())
+
+        with self.assertRaises(ingest.BufferFull):
+            buffer.append(self.queued())
+
+    def journaled(self, journal, pid):
+        with mock.patch.object(ingest.os, 'getpid', return_value=pid):
+            return ingest.WriteBehindBuffer(capacity=10, flush_interval=1, flush_rows=5, journal_path=journal)
+
+    def test_journal_is_replayed_after_crash(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = Path(tmp) / 'ingest.journal'
+            crashed = self.journaled(journal, pid=101)
+            crashed.append(self.queued(water_temperature=31))
+            crashed.append(self.queued(water_temperature=32))
+            # Dying releases the journal's lock
+            crashed._journal.close()
+
+            restarted = self.journaled(journal, pid=102)
+            self.assertEqual(restarted.flush(), 2)
+            restarted.stop()
+
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ['ingest.journal.lock'])
+        self.assertEqual(
+            sorted(TemperatureReading.objects.values_list('water_temperature', flat=True)), [31, 32]
+        )
+
+    def test_workers_keep_separate_journals(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = Path(tmp) / 'ingest.journal'
+            first = self.journaled(journal, pid=101)
+            second = self.journaled(journal, pid=102)
+            first.append(self.queued(water_temperature=31))
+            second.append(self.queued(water_temperature=32))
+            second.flush()
+
+            # A third worker starting up leaves the running workers' journals alone
+            third = self.journaled(journal, pid=103)
+            self.assertEqual(third.flush(), 0)
+            self.assertIn('"water_temperature": 31', (Path(tmp) / 'ingest.journal.101').read_text())
+
+            for buffer in (first, second, third):
+                buffer.stop()
+        self.assertEqual(
+            sorted(TemperatureReading.objects.values_list('water_temperature', flat=True)), [31, 32]
+        )
+
+    @override_settings(INGEST_WRITE_BEHIND=True)
+    def test_latest_reading_reads_through_buffer(self):
+        create_reading(water_temperature=20)
+        buffer = ingest.WriteBehindBuffer(capacity=10, flush_interval=1, flush_rows=5)
+        buffer.append(self.queued(water_temperature=35))
+
+        with mock.patch.object(ingest, 'get_buffer', return_value=buffer):
+            data = self.client.get(reverse('get_latest_reading')).json()
+
+        self.assertEqual(data['water_temperature'], 35)
+
+    @override_settings(INGEST_WRITE_BEHIND=True)
+    def test_latest_reading_survives_a_flush_during_the_lookup(self):
+        create_reading(water_temperature=20)
+        buffer = ingest.WriteBehindBuffer(capacity=10, flush_interval=1, flush_rows=5)
+        buffer.append(self.queued(water_temperature=35))
+        latest = TemperatureReading.objects.latest
+
+        def latest_then_flush(*args):
+            # The flusher writes the queued reading right after the database was read
+            reading = latest(*args)
+            buffer.flush()
+            return reading
+
+        with mock.patch.object(ingest, 'get_buffer', return_value=buffer), \
+                mock.patch.object(TemperatureReading.objects, 'latest', side_effect=latest_then_flush):
+            reading = ingest.latest_reading()
+
+        self.assertEqual(reading.water_temperature, 35)
+
+    @override_settings(INGEST_WRITE_BEHIND=True)
+    def test_batch_larger_than_the_buffer_is_rejected_for_good(self):
+        buffer = ingest.WriteBehindBuffer(capacity=3, flush_interval=1, flush_rows=5)
+        payload = {'WA': 24.5, 'AI': 26.2, 'HU': 60.5, 'SP': 25.0, 'PWR': 120}
+
+        with mock.patch.object(ingest, 'get_buffer', return_value=buffer):
+            response = self.client.post(
+                reverse('receive_sensor_data_batch'), json.dumps([payload] * 4), content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, 413)
+        self.assertNotIn('Retry-After', response)
+        self.assertIsNone(buffer.latest())
+
+
+class ReadingValidationTests(TestCase):
+    def setUp(self):
+        self.validator = validation.ReadingValidator(15.0, 40.0)
+        self.payload = {'WA': 24.5, 'AI': 26.2, 'HU': 60.5, 'SP': 25.0, 'PWR': 120}
+
+    def test_valid_payload_maps_to_model_fields(self):
+        self.assertEqual(self.validator.validate(self.payload), READING_VALUES)
+
+    def test_errors_are_reported_per_field(self):
+        payload = dict(self.payload, AI=float('nan'), HU=120, SP=99, PWR=True)
+        del payload['WA']
+
+        with self.assertRaises(validation.PayloadError) as ctx:
+            self.validator.validate(payload)
+
+        self.assertEqual(set(ctx.exception.errors), {'WA', 'AI', 'HU', 'SP', 'PWR'})
+        self.assertEqual(ctx.exception.errors['WA'], 'This field is required')
+
+    def test_missing_fields_are_not_saved_as_zero(self):
+        response = self.client.post(
+            reverse('receive_sensor_data'), data=json.dumps({'WA': 24.5}), content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('SP', response.json()['errors'])
+        self.assertFalse(TemperatureReading.objects.exists())
+
+    def test_batch_stores_valid_readings_and_reports_invalid_ones(self):
+        body = [self.payload, dict(self.payload, SP=100), self.payload]
+
+        response = self.client.post(
+            reverse('receive_sensor_data_batch'), data=json.dumps(body), content_type='application/json'
+        )
+
+        data = response.json()
+        self.assertEqual(data['accepted'], 2)
+        self.assertEqual(list(data['errors']), ['1'])
+        self.assertEqual(TemperatureReading.objects.count(), 2)
+
+    def test_integer_too_large_for_a_float_is_rejected(self):
+        body = '{"WA": 1%s, "AI": 26.2, "HU": 60.5, "SP": 25.0, "PWR": 120}' % ('0' * 400)
+
+        response = self.client.post(reverse('receive_sensor_data'), data=body, content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], {'WA': 'Must be a finite number'})
+
+    def test_validator_bounds_are_cached_until_setpoint_is_saved(self):
+        validation.get_validator()
+        with CaptureQueriesContext(connection) as queries:
+            validation.get_validator()
+        self.assertEqual(len(queries), 0)
+
+        bounds = TemperatureSetpoint.get_or_create_default()
+        bounds.max_setpoint = 50.0
+        bounds.save()
+
+        self.assertEqual(validation.get_validator().max_setpoint, 50.0)
+
+
+class TemperatureReadingAdminTests(TestCase):
+    url = reverse_lazy('admin:api_temperaturereading_changelist')
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        start = timezone.now() - timedelta(days=600)
+        TemperatureReading.objects.bulk_create(
+            TemperatureReading(timestamp=start + timedelta(days=2 * i), **READING_VALUES) for i in range(250)
+        )
+
+    def test_pages_follow_the_cursor_without_overlap(self):
+        first = self.client.get(self.url)
+        older = self.client.get(f"{self.url}{first.context['cl'].older_url}")
+
+        first_ids = [r.pk for r in first.context['cl'].result_list]
+        older_ids = [r.pk for r in older.context['cl'].result_list]
+        newest = TemperatureReading.objects.order_by('-timestamp', '-id')
+        self.assertEqual(first_ids + older_ids, list(newest.values_list('id', flat=True)[:200]))
+        self.assertContains(older, 'Newest')
+
+    def test_page_load_only_uses_index_backed_queries(self):
+        # Query plans, not row counts, decide how page loads scale to 10M
+        # rows; see test/benchmark_admin.py for timings at that size.
+        year = TemperatureReading.objects.earliest('timestamp').timestamp.year
+        pages = [self.url, f'{self.url}?timestamp__year={year}']
+        cursor = TemperatureReading.objects.order_by('timestamp')[100].pk
+        pages.append(f'{self.url}?before={cursor}')
+
+        for page in pages:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(page)
+            self.assertEqual(response.status_code, 200)
+
+            reading_queries = [q['sql'] for q in queries if 'api_temperaturereading' in q['sql']]
+            self.assertLessEqual(len(reading_queries), 40, page)
+            for sql in reading_queries:
+                with connection.cursor() as c:
+                    c.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plan = ' | '.join(row[-1] for row in c.fetchall())
+                self.assertNotRegex(plan, r'SCAN api_temperaturereading(?! USING)', sql)
+                self.assertNotIn('TEMP B-TREE', plan, sql)
+
+    def test_date_drilldown_lists_only_periods_with_readings(self):
+        first = timezone.localtime(TemperatureReading.objects.earliest('timestamp').timestamp)
+        last = timezone.localtime(TemperatureReading.objects.latest('timestamp').timestamp)
+
+        years = self.client.get(self.url).context['choices']
+        months = self.client.get(f'{self.url}?timestamp__year={first.year}').context['choices']
+
+        self.assertEqual([c['title'] for c in years], [str(y) for y in range(first.year, last.year + 1)])
+        self.assertEqual(len(months), 12 - first.month + 1)
+
+    def test_export_csv_action_streams_selection(self):
+        selected = list(TemperatureReading.objects.values_list('id', flat=True)[:3])
+
+        response = self.client.post(self.url, {
+            'action': 'export_csv',
+            '_selected_action': selected,
+        })
+
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][0], 'id')
+        self.assertEqual(sorted(int(r[0]) for r in rows[1:]), sorted(selected))
+
+
+class MQTTServiceTests(TestCase):
+    def setUp(self):
+        self.broker = mqtt_fake.FakeBroker()
+        self.service = mqtt.MQTTService(client_factory=lambda: mqtt_fake.FakeClient(self.broker))
+        self.addCleanup(self.service.stop)
+
+    def test_client_is_created_lazily_and_shared(self):
+        self.assertIsNone(self.service._client)
+
+        client = self.service.client
+
+        self.assertIs(self.service.client, client)
+        self.assertTrue(client.connected)
+
+    def test_sensor_data_published_over_mqtt_is_ingested(self):
+        self.service.start()
+        device = mqtt_fake.FakeClient(self.broker)
+        payload = {'WA': 24.5, 'AI': 26.2, 'HU': 60.5, 'SP': 25.0, 'PWR': 120}
+
+        with self.assertLogs('smartAquarium.mqtt', 'WARNING') as logs:
+            device.publish(settings.MQTT_INGEST_TOPIC, json.dumps([payload, dict(payload, SP=99)]))
+
+        self.assertEqual(TemperatureReading.objects.count(), 1)
+        self.assertIn('Rejected MQTT reading 1', logs.output[0])
+
+    def test_ingest_errors_do_not_escape_the_network_thread(self):
+        self.service.start()
+        device = mqtt_fake.FakeClient(self.broker)
+        payload = {'WA': 24.5, 'AI': 26.2, 'HU': 60.5, 'SP': 25.0, 'PWR': 120}
+
+        with mock.patch.object(ingest, 'save_readings', side_effect=OperationalError('database is locked')), \
+                self.assertLogs('smartAquarium.mqtt', 'ERROR'):
+            device.publish(settings.MQTT_INGEST_TOPIC, json.dumps(payload))
+
+    def test_restarting_registers_one_exit_handler(self):
+        with mock.patch.object(mqtt.atexit, 'register') as register:
+            service = mqtt.MQTTService(client_factory=lambda: mqtt_fake.FakeClient(self.broker))
+            service.start()
+            service.stop()
+            service.start()
+            service.stop()
+
+        register.assert_called_once_with(service.stop)
+
+    def test_topic_wildcards(self):
+        self.assertTrue(mqtt_fake.topic_matches('furnace/+/data', 'furnace/1/data'))
+        self.assertTrue(mqtt_fake.topic_matches('furnace/#', 'furnace/1/data'))
+        self.assertFalse(mqtt_fake.topic_matches('furnace/+', 'furnace/1/data'))
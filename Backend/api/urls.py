@@ -3,8 +3,11 @@ from . import views
 
 urlpatterns = [
     path('sensor-data/', views.receive_sensor_data, name='receive_sensor_data'),
+    path('sensor-data/batch/', views.receive_sensor_data_batch, name='receive_sensor_data_batch'),
     path('latest-reading/', views.get_latest_reading, name='get_latest_reading'),
     path('setpoint/', views.get_setpoint, name='get_setpoint'),
     path('setpoint/set/', views.set_setpoint, name='set_setpoint'),
+    path('setpoint/profile/start/', views.start_profile, name='start_profile'),
+    path('setpoint/profile/stop/', views.stop_profile, name='stop_profile'),
     path('readings-history/', views.get_readings_history, name='get_readings_history'),
 ]
@@ -0,0 +1,122 @@
+"""
+Validation for sensor payloads in the Arduino format:
+{WA:24.50, AI:26.20, HU:60.50, SP:25.00, PWR:120}
+
+The schema is compiled once per set of setpoint bounds into a flat tuple of
+checks, and the same validator is shared by the HTTP, batch and MQTT ingest
+paths. Every field is required, must be a finite number and within range.
+The bounds are cached per process: a save of TemperatureSetpoint resets the
+cache in the saving process, other processes pick it up within BOUNDS_TTL.
+"""
+
+import math
+import time
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import TemperatureSetpoint
+
+
+BOUNDS_TTL = 5.0  # seconds between setpoint bound lookups
+
+
+class PayloadError(ValueError):
+    """Raised with a {key: message} dict when a payload fails validation"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(f'{key}: {message}' for key, message in errors.items()))
+
+
+_MISSING = object()
+_INF = math.inf
+_isfinite = math.isfinite
+
+
+class ReadingValidator:
+    def __init__(self, min_setpoint, max_setpoint):
+        self.min_setpoint = min_setpoint
+        self.max_setpoint = max_setpoint
+        # (payload key, model field, low, high); None means unbounded
+        self.checks = (
+            ('WA', 'water_temperature', None, None),
+            ('AI', 'air_temperature', None, None),
+            ('HU', 'humidity', 0.0, 100.0),
+            ('SP', 'setpoint', min_setpoint, max_setpoint),
+            ('PWR', 'pid_output', None, None),
+        )
+
+    def validate(self, payload):
+        """Return TemperatureReading field values for a payload, or raise PayloadError"""
+        if type(payload) is not dict:
+            raise PayloadError({'payload': 'Expected a JSON object'})
+
+        values = {}
+        errors = None
+        for key, field, low, high in self.checks:
+            raw = payload.get(key, _MISSING)
+            kind = type(raw)
+            # bool is an int subclass, so compare exact types to reject it
+            if kind is float:
+                value = raw
+            elif kind is int:
+                try:
+                    value = float(raw)
+                except OverflowError:
+                    # Integer too large for a float
+                    value = _INF
+            elif kind is str:
+                try:
+                    value = float(raw)
+                except ValueError:
+                    value = None
+            else:
+                value = None
+
+            if value is None:
+                message = 'This field is required' if raw is _MISSING else 'Must be a number'
+            elif not _isfinite(value):
+                message = 'Must be a finite number'
+            elif (low is not None and value < low) or (high is not None and value > high):
+                message = f'Must be between {low} and {high}'
+            else:
+                values[field] = value
+                continue
+
+            if errors is None:
+                errors = {}
+            errors[key] = message
+
+        if errors:
+            raise PayloadError(errors)
+        return values
+
+
+_validator = None
+_validator_expires = 0.0
+
+
+def get_validator():
+    """
+    Get the shared validator. The setpoint bounds are looked up at most once
+    per BOUNDS_TTL, and the schema is recompiled only when they changed.
+    """
+    global _validator, _validator_expires
+    validator = _validator
+    now = time.monotonic()
+    if validator is None or now >= _validator_expires:
+        bounds = TemperatureSetpoint.get_or_create_default()
+        if (validator is None
+                or validator.min_setpoint != bounds.min_setpoint
+                or validator.max_setpoint != bounds.max_setpoint):
+            validator = _validator = ReadingValidator(bounds.min_setpoint, bounds.max_setpoint)
+        _validator_expires = now + BOUNDS_TTL
+    return validator
+
+
+@receiver(post_save, sender=TemperatureSetpoint)
+def reset_validator(sender, **kwargs):
+    """Look the bounds up again on the next get_validator() call"""
+    global _validator_expires
+    _validator_expires = 0.0
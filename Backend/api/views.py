@@ -2,8 +2,14 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
+from django.utils import timezone
 import json
-from .models import TemperatureReading, TemperatureSetpoint
+import logging
+from . import ingest, validation
+from .models import SetpointProfile, TemperatureReading, TemperatureSetpoint
+
+
+logger = logging.getLogger(__name__)
 
 
 @csrf_exempt
@@ -15,47 +21,100 @@ def receive_sensor_data(request):
     """
     try:
         body = json.loads(request.body)
-        
-        # Extract data from request
-        water_temp = float(body.get('WA', 0))
-        air_temp = float(body.get('AI', 0))
-        humidity = float(body.get('HU', 0))
-        setpoint = float(body.get('SP', 0))
-        pid_output = float(body.get('PWR', 0))
-        
-        # Save reading to database
-        reading = TemperatureReading.objects.create(
-            water_temperature=water_temp,
-            air_temperature=air_temp,
-            humidity=humidity,
-            setpoint=setpoint,
-            pid_output=pid_output
-        )
-        
+    except ValueError:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Invalid JSON'
+        }, status=400)
+    
+    try:
+        values = validation.get_validator().validate(body)
+    except validation.PayloadError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Invalid sensor data',
+            'errors': e.errors
+        }, status=400)
+    
+    try:
+        # Save reading to database, or queue it when write-behind is enabled
+        reading_id = ingest.save_reading(values)
+    except ingest.BufferFull as e:
+        return _buffer_full_response(e)
+    
+    if reading_id is None:
         return JsonResponse({
             'status': 'success',
-            'message': 'Data received and saved',
-            'reading_id': reading.id
-        })
-    except Exception as e:
+            'message': 'Data received and queued'
+        }, status=202)
+    
+    return JsonResponse({
+        'status': 'success',
+        'message': 'Data received and saved',
+        'reading_id': reading_id
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def receive_sensor_data_batch(request):
+    """
+    Receive a list of sensor readings in the same format as receive_sensor_data.
+    Valid readings are stored, invalid ones are reported by index.
+    """
+    try:
+        body = json.loads(request.body)
+    except ValueError:
         return JsonResponse({
             'status': 'error',
-            'message': str(e)
+            'message': 'Invalid JSON'
+        }, status=400)
+    
+    if not isinstance(body, list):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Expected a list of readings'
         }, status=400)
+    
+    try:
+        stored, errors = ingest.ingest_payloads(body)
+    except ingest.BufferFull as e:
+        return _buffer_full_response(e)
+    except ingest.BatchTooLarge as e:
+        # Retrying can't help, unlike a full buffer
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=413)
+    
+    return JsonResponse({
+        'status': 'success' if not errors else 'partial',
+        'accepted': stored,
+        'rejected': len(errors),
+        'errors': {str(index): field_errors for index, field_errors in errors.items()}
+    }, status=200 if stored or not errors else 400)
+
+
+def _buffer_full_response(error):
+    response = JsonResponse({
+        'status': 'error',
+        'message': str(error)
+    }, status=503)
+    response['Retry-After'] = '1'
+    return response
 
 
 @require_http_methods(["GET"])
 def get_latest_reading(request):
     """Get the latest temperature and humidity reading"""
     try:
-        reading = TemperatureReading.objects.latest('timestamp')
-        setpoint_obj = TemperatureSetpoint.get_or_create_default()
+        reading = ingest.latest_reading()
         
         return JsonResponse({
             'water_temperature': reading.water_temperature,
             'air_temperature': reading.air_temperature,
             'humidity': reading.humidity,
-            'setpoint': setpoint_obj.setpoint,
+            'setpoint': current_setpoint(),
             'pid_output': reading.pid_output,
             'timestamp': reading.timestamp.isoformat()
         })
@@ -66,16 +125,56 @@ def get_latest_reading(request):
         }, status=404)
 
 
+def _active_profile():
+    """
+    Get the running profile and its evaluator, or (None, None). A profile whose
+    segments can't be evaluated is logged and ignored so the static setpoint
+    keeps being served instead of an error on every firmware poll.
+    """
+    profile = SetpointProfile.get_active()
+    if profile is None:
+        return None, None
+    try:
+        return profile, profile.get_evaluator()
+    except ValueError as e:
+        logger.error('Ignoring running profile %s (%s): %s', profile.id, profile.name, e)
+        return None, None
+
+
+def current_setpoint(setpoint_obj=None):
+    """Setpoint of the running profile, falling back to the static setpoint"""
+    profile, _ = _active_profile()
+    if profile is not None:
+        return round(profile.setpoint_at(timezone.now()), 2)
+    if setpoint_obj is None:
+        setpoint_obj = TemperatureSetpoint.get_or_create_default()
+    return setpoint_obj.setpoint
+
+
 @require_http_methods(["GET"])
 def get_setpoint(request):
-    """Get current temperature setpoint"""
+    """Get current temperature setpoint, following the running profile if any"""
     setpoint_obj = TemperatureSetpoint.get_or_create_default()
+    profile, evaluator = _active_profile()
     
-    return JsonResponse({
+    data = {
         'setpoint': setpoint_obj.setpoint,
         'min_setpoint': setpoint_obj.min_setpoint,
-        'max_setpoint': setpoint_obj.max_setpoint
-    })
+        'max_setpoint': setpoint_obj.max_setpoint,
+        'profile': None
+    }
+    
+    if profile is not None:
+        elapsed = profile.elapsed(timezone.now())
+        data['setpoint'] = round(evaluator.setpoint_at(elapsed), 2)
+        data['profile'] = {
+            'id': profile.id,
+            'name': profile.name,
+            'elapsed': elapsed,
+            'finished': evaluator.is_finished(elapsed)
+        }
+    
+    return JsonResponse(data)
 
 
 @csrf_exempt
@@ -95,6 +194,18 @@ def set_setpoint(request):
                 'message': f'Setpoint must be between {setpoint_obj.min_setpoint} and {setpoint_obj.max_setpoint}'
             }, status=400)
         
+        # A running profile overrides the static setpoint, so don't silently ignore the change.
+        # A finished one only holds its last value and makes way for the manual setpoint.
+        profile, evaluator = _active_profile()
+        if profile is not None:
+            if not evaluator.is_finished(profile.elapsed(timezone.now())):
+                return JsonResponse({
+                    'status': 'error',
+                    'message': f'Profile {profile.name} is running, stop it before setting a setpoint',
+                    'profile_id': profile.id
+                }, status=409)
+            profile.stop()
+        
         setpoint_obj.setpoint = new_setpoint
         setpoint_obj.save()
         
@@ -110,6 +221,52 @@ def set_setpoint(request):
         }, status=400)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def start_profile(request):
+    """Start a setpoint profile"""
+    try:
+        body = json.loads(request.body)
+        profile = SetpointProfile.objects.get(id=int(body.get('profile_id')))
+        # Raises ValueError for segments that can't be evaluated
+        profile.start()
+        
+        return JsonResponse({
+            'status': 'success',
+            'profile_id': profile.id,
+            'message': f'Profile {profile.name} started'
+        })
+    except SetpointProfile.DoesNotExist:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Profile not found'
+        }, status=404)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def stop_profile(request):
+    """Stop the running setpoint profile"""
+    profile = SetpointProfile.get_active()
+    if profile is None:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'No profile is running'
+        }, status=404)
+    
+    profile.stop()
+    
+    return JsonResponse({
+        'status': 'success',
+        'message': f'Profile {profile.name} stopped'
+    })
+
+
 @require_http_methods(["GET"])
 def get_readings_history(request):
     """Get historical readings (last 50)"""
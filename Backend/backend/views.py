@@ -1,11 +1,13 @@
 from django.shortcuts import render
 from api.models import TemperatureReading, TemperatureSetpoint
+from api import ingest
+from api.views import current_setpoint
 
 
 def dashboard(request):
     """Display temperature and humidity dashboard"""
     try:
-        latest_reading = TemperatureReading.objects.latest('timestamp')
+        latest_reading = ingest.latest_reading()
     except TemperatureReading.DoesNotExist:
         latest_reading = None
     
@@ -13,7 +15,7 @@ def dashboard(request):
     
     context = {
         'latest_reading': latest_reading,
-        'setpoint': setpoint_obj.setpoint,
+        'setpoint': current_setpoint(setpoint_obj),
         'min_setpoint': setpoint_obj.min_setpoint,
         'max_setpoint': setpoint_obj.max_setpoint,
     }
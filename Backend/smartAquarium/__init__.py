@@ -1,2 +0,0 @@
-# from . import mqtt
-# mqtt.client.loop_start()
\ No newline at end of file
@@ -11,6 +11,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from smartAquarium.mqtt import autostart
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smartAquarium.settings')
 
 application = get_asgi_application()
+
+# Only serving processes load this module, so they alone connect at startup
+autostart()
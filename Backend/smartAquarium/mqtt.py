@@ -1,25 +1,159 @@
-import paho.mqtt.client as mqtt
+"""
+Process-wide MQTT connection.
+
+Nothing connects, or even imports paho, at import time. get_service() returns
+this process's MQTTService, whose client is created the first time it is
+needed and connects in the background with connect_async() and loop_start().
+paho's network thread then keeps reconnecting with exponential backoff
+between MQTT_RECONNECT_MIN_DELAY and MQTT_RECONNECT_MAX_DELAY seconds.
+
+Set MQTT_FAKE_BROKER to use the in-memory broker from mqtt_fake instead of
+the network, and MQTT_AUTOSTART to connect as soon as a serving process loads
+wsgi.py or asgi.py. Management commands such as migrate, test and run_jobs
+never load those, and neither does the runserver autoreloader parent.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING
+
 from django.conf import settings
+from django.db import close_old_connections
+
+if TYPE_CHECKING:
+    import paho.mqtt.client as mqtt
+
+
+logger = logging.getLogger(__name__)
 
 
 def on_connect(mqtt_client:mqtt.Client, userdata, flags, rc):
     if rc == 0:
         print('Connected successfully')
         mqtt_client.subscribe('django/mqtt')
+        mqtt_client.subscribe(settings.MQTT_INGEST_TOPIC)
     else:
         print('Bad connection. Code:', rc)
 
 
 def on_message(mqtt_client:mqtt.Client, userdata, msg:mqtt.MQTTMessage):
+    if msg.topic == settings.MQTT_INGEST_TOPIC:
+        handle_sensor_data(msg.payload)
+        return
     print(f'Received message on topic: {msg.topic} with payload: {msg.payload}')
 
 
-client = mqtt.Client()
-client.on_connect = on_connect
-client.on_message = on_message
-client.username_pw_set(settings.MQTT_USER, settings.MQTT_PASSWORD)
-client.connect(
-    host=settings.MQTT_SERVER,
-    port=settings.MQTT_PORT,
-    keepalive=settings.MQTT_KEEPALIVE
-)
\ No newline at end of file
+def handle_sensor_data(payload:bytes):
+    """Store a reading, or a list of readings, published in the Arduino format"""
+    from api import ingest
+
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        logger.warning('Ignoring invalid JSON on %s: %r', settings.MQTT_INGEST_TOPIC, payload)
+        return
+
+    # Runs on paho's long-lived network thread, not in a request. paho re-raises
+    # callback exceptions, which would end that thread and with it all MQTT ingest.
+    try:
+        close_old_connections()
+        _, errors = ingest.ingest_payloads(data if isinstance(data, list) else [data])
+    except ingest.BufferFull:
+        logger.warning('Ingest buffer full, dropping MQTT readings from %s', settings.MQTT_INGEST_TOPIC)
+        return
+    except ingest.BatchTooLarge as e:
+        logger.warning('Dropping MQTT batch from %s: %s', settings.MQTT_INGEST_TOPIC, e)
+        return
+    except Exception:
+        logger.exception('Failed to store MQTT readings from %s', settings.MQTT_INGEST_TOPIC)
+        return
+
+    for index, field_errors in errors.items():
+        logger.warning('Rejected MQTT reading %d from %s: %s', index, settings.MQTT_INGEST_TOPIC, field_errors)
+
+
+def create_client():
+    if settings.MQTT_FAKE_BROKER:
+        from .mqtt_fake import FakeClient
+        return FakeClient()
+
+    import paho.mqtt.client as mqtt
+    if hasattr(mqtt, 'CallbackAPIVersion'):
+        # paho-mqtt 2.x, keep the 1.x callback signatures used above
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION1)
+    return mqtt.Client()
+
+
+class MQTTService:
+    """Lazily started, shared MQTT client"""
+
+    def __init__(self, client_factory=create_client):
+        self._client_factory = client_factory
+        self._client = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    @property
+    def client(self):
+        """The client, started on first access; it may still be connecting"""
+        if self._client is None:
+            self.start()
+        return self._client
+
+    def start(self):
+        """Start connecting in the background; never blocks on the network"""
+        with self._lock:
+            if self._client is not None:
+                return
+            client = self._client_factory()
+            client.on_connect = on_connect
+            client.on_message = on_message
+            client.username_pw_set(settings.MQTT_USER, settings.MQTT_PASSWORD)
+            client.reconnect_delay_set(
+                min_delay=settings.MQTT_RECONNECT_MIN_DELAY,
+                max_delay=settings.MQTT_RECONNECT_MAX_DELAY
+            )
+            client.connect_async(
+                host=settings.MQTT_SERVER,
+                port=settings.MQTT_PORT,
+                keepalive=settings.MQTT_KEEPALIVE
+            )
+            client.loop_start()
+            self._client = client
+
+    def stop(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.disconnect()
+            client.loop_stop()
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        """Publish a message; with qos 0 it is dropped if the broker is unreachable"""
+        return self.client.publish(topic, payload, qos=qos, retain=retain)
+
+
+_service = None
+_service_pid = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """Get this process's MQTTService, with a fresh one in forked workers"""
+    global _service, _service_pid
+    with _service_lock:
+        if _service is None or _service_pid != os.getpid():
+            _service = MQTTService()
+            _service_pid = os.getpid()
+        return _service
+
+
+def autostart():
+    """Start connecting now if MQTT_AUTOSTART is set; called from wsgi.py and asgi.py"""
+    if settings.MQTT_AUTOSTART:
+        get_service().start()
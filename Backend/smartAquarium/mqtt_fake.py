@@ -0,0 +1,127 @@
+"""
+In-memory MQTT broker for tests and offline development.
+
+FakeClient implements the part of paho's Client API that mqtt.py uses.
+Published messages are delivered synchronously to every client subscribed
+on the same FakeBroker, and are kept in FakeBroker.published.
+"""
+
+import itertools
+import threading
+
+
+class FakeMessage:
+    def __init__(self, topic, payload, qos=0, retain=False):
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+
+
+class FakeMessageInfo:
+    def __init__(self, mid):
+        self.mid = mid
+        self.rc = 0
+
+    def is_published(self):
+        return True
+
+    def wait_for_publish(self, timeout=None):
+        return None
+
+
+def topic_matches(subscription, topic):
+    """MQTT topic filter matching with + and # wildcards"""
+    sub_levels = subscription.split('/')
+    topic_levels = topic.split('/')
+    for i, level in enumerate(sub_levels):
+        if level == '#':
+            return True
+        if i >= len(topic_levels) or (level != '+' and level != topic_levels[i]):
+            return False
+    return len(sub_levels) == len(topic_levels)
+
+
+class FakeBroker:
+    def __init__(self):
+        self.subscriptions = []
+        self.published = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, client, topic):
+        with self._lock:
+            self.subscriptions.append((client, topic))
+
+    def unsubscribe_all(self, client):
+        with self._lock:
+            self.subscriptions = [(c, t) for c, t in self.subscriptions if c is not client]
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        elif payload is None:
+            payload = b''
+        message = FakeMessage(topic, payload, qos, retain)
+        with self._lock:
+            self.published.append(message)
+            receivers = [c for c, t in self.subscriptions if topic_matches(t, topic)]
+        for client in receivers:
+            client.deliver(message)
+
+
+default_broker = FakeBroker()
+
+
+class FakeClient:
+    _mids = itertools.count(1)
+
+    def __init__(self, broker=None, userdata=None):
+        self.broker = broker or default_broker
+        self.userdata = userdata
+        self.on_connect = None
+        self.on_message = None
+        self.username = None
+        self.host = None
+        self.connected = False
+
+    def username_pw_set(self, username, password=None):
+        self.username = username
+
+    def reconnect_delay_set(self, min_delay=1, max_delay=120):
+        pass
+
+    def connect_async(self, host, port=1883, keepalive=60, **kwargs):
+        self.host = host
+
+    def connect(self, host, port=1883, keepalive=60, **kwargs):
+        self.host = host
+        self._connected()
+        return 0
+
+    def loop_start(self):
+        if not self.connected:
+            self._connected()
+
+    def loop_stop(self):
+        pass
+
+    def disconnect(self):
+        self.connected = False
+        self.broker.unsubscribe_all(self)
+
+    def subscribe(self, topic, qos=0):
+        self.broker.subscribe(self, topic)
+        return 0, next(self._mids)
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.broker.publish(topic, payload, qos, retain)
+        return FakeMessageInfo(next(self._mids))
+
+    def deliver(self, message):
+        if self.on_message is not None:
+            self.on_message(self, self.userdata, message)
+
+    def _connected(self):
+        self.connected = True
+        if self.on_connect is not None:
+            self.on_connect(self, self.userdata, {}, 0)
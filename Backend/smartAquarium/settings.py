@@ -140,4 +140,30 @@ MQTT_PASSWORD = 'your_mqtt_password'
 MQTT_SERVER = 'broker.hivemq.com'
 MQTT_PORT = 1883
 MQTT_KEEPALIVE = 60
+MQTT_INGEST_TOPIC = 'heat-treatment/sensor-data'
+MQTT_RECONNECT_MIN_DELAY = 1  # seconds, doubled after each failed attempt
+MQTT_RECONNECT_MAX_DELAY = 120
+MQTT_AUTOSTART = False  # connect when the WSGI/ASGI app loads instead of on first use
+MQTT_FAKE_BROKER = False  # use the in-memory broker in smartAquarium/mqtt_fake.py
+
+# Background job settings (see `python manage.py run_jobs`)
+BACKUP_DIR = BASE_DIR / 'backups'
+READING_RETENTION_DAYS = 90
+BACKUP_RETENTION_DAYS = 30
+JOB_WORKERS = 2
+JOB_CHUNK_SIZE = 500
+JOB_CHUNK_PAUSE = 0.05  # seconds between chunks so ingest can take the write lock
+JOB_SCHEDULE = {  # job name -> interval in seconds
+    'backup_database': 24 * 60 * 60,
+    'export_csv': 24 * 60 * 60,
+    'prune_readings': 60 * 60,
+    'prune_backups': 24 * 60 * 60,
+    # Add 'vacuum': 7 * 24 * 60 * 60 after `manage.py enable_incremental_vacuum`
+}
 
+# Write-behind ingest settings (see api/ingest.py)
+INGEST_WRITE_BEHIND = False  # with several workers, latest-reading only sees the serving worker's buffer
+INGEST_BUFFER_SIZE = 10000  # queued readings before answering 503, also the largest batch accepted
+INGEST_FLUSH_INTERVAL_MS = 500
+INGEST_FLUSH_ROWS = 200
+INGEST_JOURNAL_PATH = None  # e.g. BASE_DIR / 'ingest.journal' for crash durability, written as <path>.<pid>
@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from smartAquarium.mqtt import autostart
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smartAquarium.settings')
 
 application = get_wsgi_application()
+
+# Only serving processes load this module, so they alone connect at startup
+autostart()
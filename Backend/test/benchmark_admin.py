@@ -0,0 +1,89 @@
+"""
+Benchmark admin page loads for the readings change list on a large table.
+Usage: python test/benchmark_admin.py [rows] [db_path]
+
+Fills a separate SQLite database (default 10M readings, one every 2s) and
+times the change list pages. Exits non-zero if any page exceeds BUDGET.
+The database is kept, so later runs with the same path skip the fill.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smartAquarium.settings')
+
+import django
+from django.conf import settings
+
+BUDGET = 1.0  # seconds per page load
+
+
+def main(rows=10_000_000, db_path=None):
+    db_path = db_path or os.path.join(tempfile.gettempdir(), f'readings_benchmark_{rows}.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.ALLOWED_HOSTS = ['*']
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+    from api.models import TemperatureReading
+
+    call_command('migrate', verbosity=0)
+    existing = TemperatureReading.objects.aggregate(django.db.models.Max('pk'))['pk__max'] or 0
+    if existing < rows:
+        print(f'Filling {db_path} with {rows - existing} readings...')
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'WITH RECURSIVE seq(i) AS (SELECT %s UNION ALL SELECT i + 1 FROM seq WHERE i < %s) '
+                'INSERT INTO api_temperaturereading '
+                '(timestamp, water_temperature, air_temperature, humidity, setpoint, pid_output) '
+                "SELECT datetime('2024-01-01', '+' || (i * 2) || ' seconds'), "
+                '20 + (i %% 1000) / 100.0, 22.0, 60.0, 25.0, 120.0 FROM seq',
+                [existing, rows - 1]
+            )
+        print(f'Filled in {time.perf_counter() - started:.1f}s')
+
+    user = User.objects.filter(username='benchmark').first()
+    if user is None:
+        user = User.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark')
+    client = Client()
+    client.force_login(user)
+
+    url = reverse('admin:api_temperaturereading_changelist')
+    middle = TemperatureReading.objects.values_list('pk', 'timestamp').get(pk=rows // 2)
+    pages = {
+        'first page': url,
+        'deep page (cursor)': f'{url}?before={middle[0]}',
+        'year drilldown': f'{url}?timestamp__year={middle[1].year}',
+        'month drilldown': f'{url}?timestamp__year={middle[1].year}&timestamp__month={middle[1].month}',
+        'day drilldown': (f'{url}?timestamp__year={middle[1].year}&timestamp__month={middle[1].month}'
+                          f'&timestamp__day={middle[1].day}'),
+    }
+
+    slow = []
+    print(f'Change list timings with {rows} readings:')
+    for name, page in pages.items():
+        client.get(page)
+        started = time.perf_counter()
+        response = client.get(page)
+        elapsed = time.perf_counter() - started
+        status = 'ok' if response.status_code == 200 and elapsed <= BUDGET else 'SLOW'
+        if status != 'ok':
+            slow.append(name)
+        print(f'  {name:<20} {elapsed * 1000:8.1f} ms  {status}')
+
+    if slow:
+        print(f'Over the {BUDGET}s budget: {", ".join(slow)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) if i == 0 else arg for i, arg in enumerate(sys.argv[1:3])))
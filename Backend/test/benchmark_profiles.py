@@ -0,0 +1,50 @@
+"""
+Benchmark the ramp-soak profile evaluator for many devices running profiles.
+Usage: python test/benchmark_profiles.py [devices] [segments]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.profiles import HOLD, RAMP, STEP, ProfileEvaluator
+
+
+def random_segments(count):
+    segments = []
+    for _ in range(count):
+        kind = random.choice((RAMP, RAMP, HOLD, STEP))
+        if kind == HOLD:
+            segments.append((HOLD, None, None, random.uniform(1, 120)))
+        else:
+            segments.append((kind, random.uniform(20, 900), random.uniform(0.5, 10), None))
+    return segments
+
+
+def main(devices=5000, segments=50, ticks=20):
+    random.seed(42)
+    programs = [random_segments(segments) for _ in range(devices)]
+
+    started = time.perf_counter()
+    evaluators = [ProfileEvaluator(25.0, program) for program in programs]
+    build_time = time.perf_counter() - started
+
+    samples = [[random.uniform(0, e.duration) for _ in range(ticks)] for e in evaluators]
+    started = time.perf_counter()
+    for evaluator, times in zip(evaluators, samples):
+        for t in times:
+            evaluator.setpoint_at(t)
+    eval_time = time.perf_counter() - started
+    evaluations = devices * ticks
+
+    print(f'Devices: {devices}, segments per profile: {segments}')
+    print(f'Build:    {build_time * 1000:.1f} ms total, {build_time / devices * 1e6:.1f} µs per profile')
+    print(f'Evaluate: {evaluations} lookups in {eval_time * 1000:.1f} ms, {eval_time / evaluations * 1e9:.0f} ns per lookup')
+    print(f'One tick for all devices: {eval_time / ticks * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
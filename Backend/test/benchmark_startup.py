@@ -0,0 +1,52 @@
+"""
+Benchmark process startup with the lazy MQTT service.
+Usage: python test/benchmark_startup.py [runs]
+
+Times fresh interpreters doing django.setup() plus importing the MQTT module,
+`manage.py check`, and starting the service against the in-memory broker,
+so none of them touch the network.
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+SETUP = (
+    "import os; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smartAquarium.settings'); "
+    "import django; django.setup(); "
+)
+
+CASES = {
+    'python only': [sys.executable, '-c', 'pass'],
+    'django.setup()': [sys.executable, '-c', SETUP],
+    'setup + import mqtt': [sys.executable, '-c', SETUP + 'import smartAquarium.mqtt'],
+    'setup + fake broker publish': [sys.executable, '-c', SETUP + (
+        "from django.conf import settings; settings.MQTT_FAKE_BROKER = True; "
+        "from smartAquarium.mqtt import get_service; "
+        "get_service().publish('django/mqtt', 'ping'); get_service().stop()"
+    )],
+    'manage.py check': [sys.executable, 'manage.py', 'check'],
+}
+
+
+def time_command(command, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=BACKEND, check=True, capture_output=True)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(runs=5):
+    print(f'Median wall time over {runs} runs:')
+    for name, command in CASES.items():
+        print(f'  {name:<28} {time_command(command, runs) * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,80 @@
+"""
+Benchmark sensor payload validation on the ingest path.
+Usage: python test/benchmark_validation.py [samples]
+
+Times validate() alone, and get_validator().validate() as receive_sensor_data
+calls it, against a throwaway SQLite database so the setpoint bounds lookup
+is included. The last line shows what an uncached lookup per reading costs.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smartAquarium.settings')
+
+import django
+from django.conf import settings
+
+
+def random_payload():
+    return {
+        'WA': round(random.uniform(20.0, 30.0), 2),
+        'AI': round(random.uniform(20.0, 30.0), 2),
+        'HU': round(random.uniform(40.0, 80.0), 2),
+        'SP': round(random.uniform(20.0, 30.0), 2),
+        'PWR': random.randint(100, 200)
+    }
+
+
+def bench(get_validator, payloads):
+    from api.validation import PayloadError
+
+    rejected = 0
+    started = time.perf_counter()
+    for payload in payloads:
+        try:
+            get_validator().validate(payload)
+        except PayloadError:
+            rejected += 1
+    return time.perf_counter() - started, rejected
+
+
+def report(name, samples, elapsed, rejected):
+    print(f'{name:>24}: {samples} payloads in {elapsed * 1000:.1f} ms, '
+          f'{elapsed / samples * 1e6:.2f} µs per payload, {rejected} rejected')
+
+
+def main(samples=100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATABASES['default']['NAME'] = os.path.join(tmp, 'benchmark.sqlite3')
+        django.setup()
+
+        from django.core.management import call_command
+        from api.models import TemperatureSetpoint
+        from api.validation import ReadingValidator, get_validator
+
+        call_command('migrate', verbosity=0)
+        random.seed(42)
+        validator = ReadingValidator(15.0, 40.0)
+        valid = [random_payload() for _ in range(samples)]
+        invalid = [dict(payload, HU=float('nan'), SP=99) for payload in valid]
+
+        for name, payloads in (('valid', valid), ('invalid', invalid)):
+            report(name, samples, *bench(lambda: validator, payloads))
+        report('valid, get_validator()', samples, *bench(get_validator, valid))
+
+        lookups = samples // 10
+        started = time.perf_counter()
+        for _ in range(lookups):
+            TemperatureSetpoint.get_or_create_default()
+        elapsed = time.perf_counter() - started
+        print(f'{"uncached bounds lookup":>24}: {elapsed / lookups * 1e6:.2f} µs per call')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
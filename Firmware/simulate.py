@@ -0,0 +1,311 @@
+"""
+Replay and simulation tool for load testing and control tuning.
+
+  model:  simulate N furnaces as first-order thermal plants, each driven by
+          its own PID controller, stepped together as numpy arrays
+  replay: stream recorded readings from a CSV export (run_jobs export_csv)
+
+Both post to the ingest API at --speed times real time, so the tool works as
+a load generator against a local `manage.py runserver` by default; pass --url
+to target another server. With --dry-run nothing is sent, which together with
+a fixed --setpoint lets you compare PID tunings offline.
+
+Examples:
+  python simulate.py model --furnaces 200 --speed 20 --duration 3600 --batch
+  python simulate.py model --dry-run --setpoint 30 --kp 25 --ki 0.2 --duration 7200
+  python simulate.py replay readings_20251126_063000.csv --speed 60 --furnaces 10
+"""
+
+import argparse
+import csv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import requests
+
+LOCAL_URL = "http://127.0.0.1:8000/api/"
+
+
+class Sender:
+    """Posts readings to the ingest API and keeps request statistics"""
+
+    def __init__(self, base_url:str, batch:bool, concurrency:int, dry_run:bool):
+        self.base_url = base_url
+        self.batch = batch
+        self.dry_run = dry_run
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.readings = 0
+        self.failed = 0
+        self.latencies = []
+
+    def session(self) -> requests.Session:
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def send(self, payloads:list):
+        if self.dry_run:
+            self.readings += len(payloads)
+            return
+        if self.batch:
+            self.post("sensor-data/batch/", payloads, len(payloads))
+        else:
+            list(self.pool.map(lambda payload: self.post("sensor-data/", payload, 1), payloads))
+
+    def post(self, path:str, body, count:int):
+        started = time.perf_counter()
+        try:
+            response = self.session().post(self.base_url + path, json=body, timeout=10)
+            ok = response.status_code < 300
+        except requests.RequestException:
+            ok = False
+        latency = time.perf_counter() - started
+        with self.lock:
+            self.latencies.append(latency)
+            self.readings += count
+            if not ok:
+                self.failed += 1
+
+    def get_set_point(self):
+        """Current setpoint from the API, or None so the caller keeps the last known one"""
+        try:
+            response = self.session().get(self.base_url + "setpoint/", timeout=10)
+            if response.status_code == 200:
+                return response.json().get("setpoint")
+        except requests.RequestException:
+            pass
+        with self.lock:
+            self.failed += 1
+        return None
+
+    def report(self, elapsed:float):
+        print(f"Readings sent: {self.readings} in {elapsed:.1f}s ({self.readings / max(elapsed, 1e-9):.0f}/s)")
+        if self.latencies:
+            latencies = np.array(self.latencies) * 1000
+            print(f"Requests: {len(latencies)}, failed: {self.failed}, "
+                  f"latency p50 {np.percentile(latencies, 50):.1f} ms, p95 {np.percentile(latencies, 95):.1f} ms, "
+                  f"max {latencies.max():.1f} ms")
+        elif self.failed:
+            print(f"Requests: none succeeded, failed: {self.failed}")
+
+    def close(self):
+        self.pool.shutdown()
+
+
+class FurnaceModel:
+    """
+    N first-order plants, T' = (ambient + gain * u - T) / tau, each under a
+    PID controller with derivative on measurement and conditional-integration
+    anti-windup. tau and gain are spread randomly so furnaces differ.
+    """
+
+    def __init__(self, furnaces:int, tau:float, gain:float, ambient:float, spread:float,
+                 kp:float, ki:float, kd:float, max_output:float, rng:np.random.Generator):
+        self.tau = tau * rng.uniform(1 - spread, 1 + spread, furnaces)
+        self.gain = gain * rng.uniform(1 - spread, 1 + spread, furnaces)
+        self.ambient = ambient
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.max_output = max_output
+        self.temperature = np.full(furnaces, ambient, dtype=float)
+        self.previous = self.temperature.copy()
+        self.integral = np.zeros(furnaces)
+        self.output = np.zeros(furnaces)
+
+    def step(self, setpoint:float, dt:float):
+        error = setpoint - self.temperature
+        derivative = -(self.temperature - self.previous) / dt
+        integral = self.integral + error * dt
+        raw = self.kp * error + self.ki * integral + self.kd * derivative
+        self.output = np.clip(raw, 0, self.max_output)
+        # Only integrate while the actuator is not saturated
+        self.integral = np.where(raw == self.output, integral, self.integral)
+
+        self.previous = self.temperature
+        alpha = 1 - np.exp(-dt / self.tau)
+        self.temperature = self.temperature + (self.ambient + self.gain * self.output - self.temperature) * alpha
+
+
+class TuningMetrics:
+    """Control quality per furnace: IAE, overshoot and settling time"""
+
+    def __init__(self, furnaces:int, band:float):
+        self.band = band
+        self.iae = np.zeros(furnaces)
+        self.overshoot = np.zeros(furnaces)
+        self.last_outside = np.zeros(furnaces)
+        self.setpoint = None
+        self.direction = 1
+        self.changed_at = 0.0
+
+    def update(self, t:float, setpoint:float, temperature:np.ndarray, dt:float):
+        if setpoint != self.setpoint:
+            if self.setpoint is not None and setpoint < self.setpoint:
+                self.direction = -1
+            else:
+                self.direction = 1
+            self.setpoint, self.changed_at = setpoint, t
+            self.overshoot[:] = 0
+            self.last_outside[:] = t
+        error = temperature - setpoint
+        self.iae += np.abs(error) * dt
+        self.overshoot = np.maximum(self.overshoot, error * self.direction)
+        self.last_outside = np.where(np.abs(error) > self.band, t, self.last_outside)
+
+    def report(self, t:float):
+        settled = self.last_outside < t
+        settling = self.last_outside - self.changed_at
+        print(f"IAE (°C·s):          mean {self.iae.mean():.1f}, worst {self.iae.max():.1f}")
+        print(f"Overshoot (°C):      mean {self.overshoot.mean():.2f}, worst {self.overshoot.max():.2f}")
+        if settled.any():
+            print(f"Settling (±{self.band}°C): mean {settling[settled].mean():.0f}s, "
+                  f"worst {settling[settled].max():.0f}s, {settled.sum()}/{settled.size} furnaces settled")
+        else:
+            print(f"Settling (±{self.band}°C): no furnace settled")
+
+
+def run_paced(ticks:int, dt:float, speed:float, step):
+    """Call step(i) for each tick, sleeping so the run lasts ticks * dt / speed"""
+    started = time.perf_counter()
+    late = 0
+    for i in range(ticks):
+        step(i)
+        if speed > 0:
+            delay = started + (i + 1) * dt / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                late += 1
+    if late:
+        print(f"Warning: {late}/{ticks} ticks ran behind schedule, lower --speed or --furnaces")
+    return time.perf_counter() - started
+
+
+def simulate_model(args, sender:Sender):
+    rng = np.random.default_rng(args.seed)
+    model = FurnaceModel(args.furnaces, args.tau, args.gain, args.ambient, args.spread,
+                         args.kp, args.ki, args.kd, args.max_output, rng)
+    metrics = TuningMetrics(args.furnaces, args.band)
+    ticks = int(args.duration / args.dt)
+    state = {'setpoint': args.setpoint}
+
+    def step(i):
+        if args.setpoint is None:
+            set_point = sender.get_set_point()
+            if set_point is not None:
+                state['setpoint'] = set_point
+        if state['setpoint'] is None:
+            return
+        model.step(state['setpoint'], args.dt)
+        metrics.update((i + 1) * args.dt, state['setpoint'], model.temperature, args.dt)
+
+        water = model.temperature + rng.normal(0, args.noise, args.furnaces)
+        air = args.ambient + rng.normal(0, args.noise, args.furnaces)
+        humidity = np.clip(60 + rng.normal(0, 5, args.furnaces), 0, 100)
+        sender.send([
+            {"WA": round(wa, 2), "AI": round(ai, 2), "HU": round(hu, 2),
+             "SP": state['setpoint'], "PWR": round(pwr, 2)}
+            for wa, ai, hu, pwr in zip(water.tolist(), air.tolist(), humidity.tolist(), model.output.tolist())
+        ])
+
+    elapsed = run_paced(ticks, args.dt, args.speed, step)
+    print(f"Simulated {args.furnaces} furnaces for {ticks * args.dt:.0f}s of plant time")
+    sender.report(elapsed)
+    if state['setpoint'] is not None:
+        metrics.report(ticks * args.dt)
+
+
+def load_history(path:str) -> list:
+    """Read a readings CSV export into (timestamp, payload) pairs, oldest first"""
+    with open(path, newline='') as f:
+        rows = [
+            (datetime.fromisoformat(row['timestamp']), {
+                "WA": float(row['water_temperature']),
+                "AI": float(row['air_temperature']),
+                "HU": float(row['humidity']),
+                "SP": float(row['setpoint']),
+                "PWR": float(row['pid_output']),
+            })
+            for row in csv.DictReader(f)
+        ]
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+def replay_history(args, sender:Sender):
+    history = load_history(args.file)
+    if not history:
+        print("No readings to replay")
+        return
+
+    start = history[0][0]
+    offsets = [(timestamp - start).total_seconds() for timestamp, _ in history]
+    started = time.perf_counter()
+    for offset, (_, payload) in zip(offsets, history):
+        if args.speed > 0:
+            delay = started + offset / args.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        sender.send([payload] * args.furnaces)
+
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {len(history)} readings ({offsets[-1]:.0f}s of history) for {args.furnaces} furnaces")
+    sender.report(elapsed)
+
+
+def parse_args():
+    # Options shared by both subcommands, given after the subcommand name
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--url", default=LOCAL_URL, help=f"API base URL (default {LOCAL_URL})")
+    common.add_argument("--furnaces", type=int, default=1, help="Number of simulated furnaces")
+    common.add_argument("--speed", type=float, default=1.0, help="Speed-up over real time, 0 for as fast as possible")
+    common.add_argument("--batch", action="store_true", help="Send each tick as one sensor-data/batch/ request")
+    common.add_argument("--concurrency", type=int, default=16, help="Parallel requests when not batching")
+    common.add_argument("--dry-run", action="store_true", help="Don't send anything")
+
+    parser = argparse.ArgumentParser(description="Replay or simulate furnaces against the ingest API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    model = commands.add_parser("model", parents=[common], help="Simulate thermal plants under PID control")
+    model.add_argument("--duration", type=float, default=3600, help="Plant time to simulate in seconds")
+    model.add_argument("--dt", type=float, default=2.0, help="Sample period in seconds")
+    model.add_argument("--setpoint", type=float, help="Fixed setpoint instead of polling the API")
+    model.add_argument("--ambient", type=float, default=22.0, help="Ambient temperature in °C")
+    model.add_argument("--tau", type=float, default=300.0, help="Plant time constant in seconds")
+    model.add_argument("--gain", type=float, default=0.1, help="Steady-state °C per unit of output")
+    model.add_argument("--spread", type=float, default=0.2, help="Random +/- spread of tau and gain between furnaces")
+    model.add_argument("--noise", type=float, default=0.05, help="Sensor noise standard deviation in °C")
+    model.add_argument("--kp", type=float, default=20.0)
+    model.add_argument("--ki", type=float, default=0.1)
+    model.add_argument("--kd", type=float, default=0.0)
+    model.add_argument("--max-output", type=float, default=255.0, help="Controller output limit")
+    model.add_argument("--band", type=float, default=0.5, help="Settling band in °C")
+    model.add_argument("--seed", type=int, default=None)
+
+    replay = commands.add_parser("replay", parents=[common], help="Replay a readings CSV export")
+    replay.add_argument("file", help="CSV written by `manage.py run_jobs --job export_csv`")
+
+    args = parser.parse_args()
+    if args.command == "model" and args.dry_run and args.setpoint is None:
+        parser.error("--dry-run needs a fixed --setpoint")
+    if not args.url.endswith("/"):
+        args.url += "/"
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sender = Sender(args.url, args.batch, args.concurrency, args.dry_run)
+    try:
+        if args.command == "model":
+            simulate_model(args, sender)
+        else:
+            replay_history(args, sender)
+    except KeyboardInterrupt:
+        print("Stopped")
+    finally:
+        sender.close()